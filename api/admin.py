@@ -7,6 +7,7 @@ class EmployeeAdmin(admin.ModelAdmin):
     list_display = ['employee_id', 'full_name', 'email', 'department', 'created_at']
     search_fields = ['employee_id', 'full_name', 'email', 'department']
     list_filter = ['department', 'created_at']
+    ordering = ['-created_at']
 
 
 @admin.register(Attendance)
@@ -15,3 +16,4 @@ class AttendanceAdmin(admin.ModelAdmin):
     search_fields = ['employee__employee_id', 'employee__full_name']
     list_filter = ['status', 'date', 'created_at']
     date_hierarchy = 'date'
+    ordering = ['-date', 'employee']
@@ -0,0 +1,68 @@
+"""
+Cached dashboard statistics.
+
+The stats endpoint is polled by the UI, so the computed payload is kept in
+Django's cache for a short time and dropped whenever employees or
+attendance change.
+"""
+
+import logging
+from datetime import date
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q, Sum
+
+from .models import Employee, AttendanceDailyRollup
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_STATS_TTL = 60
+
+
+def dashboard_stats_key(day):
+    return f'dashboard:stats:{day.isoformat()}'
+
+
+def compute_dashboard_stats(day):
+    # The running total comes from the daily rollup (one row per day) rather
+    # than a COUNT(*) that grows with every attendance record.
+    attendance_summary = AttendanceDailyRollup.objects.aggregate(
+        total=Sum(F('present_count') + F('absent_count')),
+        present_today=Sum('present_count', filter=Q(date=day)),
+        absent_today=Sum('absent_count', filter=Q(date=day))
+    )
+
+    return {
+        'total_employees': Employee.objects.count(),
+        'total_attendance_records': attendance_summary['total'] or 0,
+        'present_today': attendance_summary['present_today'] or 0,
+        'absent_today': attendance_summary['absent_today'] or 0,
+    }
+
+
+def get_dashboard_stats():
+    # On the SQLite fallback a miss also writes the cache row (a cull COUNT
+    # plus an INSERT). That is accepted: misses happen once per TTL or
+    # after a write, and the shared table is what keeps workers in step.
+    today = date.today()
+    return cache.get_or_set(
+        dashboard_stats_key(today),
+        lambda: compute_dashboard_stats(today),
+        DASHBOARD_STATS_TTL
+    )
+
+
+def invalidate_dashboard_stats():
+    # Only today's stats are ever served, so that is the only key to drop.
+    # Wait for commit so a concurrent request can't re-cache stale counts.
+    transaction.on_commit(_delete_dashboard_stats)
+
+
+def _delete_dashboard_stats():
+    # Runs after the write has committed, so a cache failure must not turn
+    # it into an error response; the entry then expires with its TTL
+    try:
+        cache.delete(dashboard_stats_key(date.today()))
+    except Exception:
+        logger.exception("Could not invalidate the cached dashboard stats")
@@ -0,0 +1,65 @@
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+
+def backfill_rollups(apps, schema_editor):
+    Attendance = apps.get_model('api', 'Attendance')
+    AttendanceDailyRollup = apps.get_model('api', 'AttendanceDailyRollup')
+    EmployeeAttendanceRollup = apps.get_model('api', 'EmployeeAttendanceRollup')
+
+    daily = Attendance.objects.order_by().values('date').annotate(
+        present=Count('id', filter=Q(status='Present')),
+        absent=Count('id', filter=Q(status='Absent'))
+    )
+    AttendanceDailyRollup.objects.bulk_create(
+        [AttendanceDailyRollup(date=row['date'], present_count=row['present'], absent_count=row['absent'])
+         for row in daily],
+        batch_size=500
+    )
+
+    per_employee = Attendance.objects.order_by().values('employee_id').annotate(
+        total=Count('id'),
+        present=Count('id', filter=Q(status='Present')),
+        absent=Count('id', filter=Q(status='Absent'))
+    )
+    EmployeeAttendanceRollup.objects.bulk_create(
+        [EmployeeAttendanceRollup(employee_id=row['employee_id'], total_count=row['total'],
+                                  present_count=row['present'], absent_count=row['absent'])
+         for row in per_employee],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDailyRollup',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False)),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'attendance_daily_rollup',
+            },
+        ),
+        migrations.CreateModel(
+            name='EmployeeAttendanceRollup',
+            fields=[
+                ('employee', models.OneToOneField(db_column='employee_id', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='attendance_rollup', serialize=False, to='api.employee')),
+                ('total_count', models.PositiveIntegerField(default=0)),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'employee_attendance_rollup',
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
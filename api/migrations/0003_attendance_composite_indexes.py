@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_attendance_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['date', 'status'], name='idx_att_date_status'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['employee', 'status'], name='idx_att_emp_status'),
+        ),
+        # Refresh planner statistics so the new indexes get picked up
+        migrations.RunSQL('ANALYZE attendance', migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_attendance_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='employee',
+            options={},
+        ),
+        migrations.AlterModelOptions(
+            name='attendance',
+            options={},
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import EmailValidator
 
 
@@ -11,12 +11,21 @@ class Employee(models.Model):
 
     class Meta:
         db_table = 'employees'
-        ordering = ['-created_at']
 
     def __str__(self):
         return f"{self.employee_id} - {self.full_name}"
 
 
+class AttendanceQuerySet(models.QuerySet):
+    def with_employee_details(self):
+        # Let the JOIN produce the employee columns instead of hydrating
+        # an Employee instance per row
+        return self.annotate(
+            employee_name=models.F('employee__full_name'),
+            employee_department=models.F('employee__department')
+        )
+
+
 class Attendance(models.Model):
     STATUS_CHOICES = [
         ('Present', 'Present'),
@@ -33,14 +42,55 @@ class Attendance(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = AttendanceQuerySet.as_manager()
+
     class Meta:
         db_table = 'attendance'
         unique_together = ['employee', 'date']
-        ordering = ['-date', 'employee']
         indexes = [
-            models.Index(fields=['employee']),
-            models.Index(fields=['date']),
+            models.Index(fields=['date', 'status'], name='idx_att_date_status'),
+            models.Index(fields=['employee', 'status'], name='idx_att_emp_status'),
         ]
 
     def __str__(self):
         return f"{self.employee.employee_id} - {self.date} - {self.status}"
+
+    def save(self, *args, **kwargs):
+        # The rollup signals read the previous row under lock, so they have
+        # to share a transaction with the write itself
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def rollup_key(self):
+        return (self.employee_id, self.date, self.status)
+
+
+class AttendanceDailyRollup(models.Model):
+    date = models.DateField(primary_key=True)
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'attendance_daily_rollup'
+
+    def __str__(self):
+        return f"{self.date} - {self.present_count} present, {self.absent_count} absent"
+
+
+class EmployeeAttendanceRollup(models.Model):
+    employee = models.OneToOneField(
+        Employee,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='attendance_rollup',
+        db_column='employee_id'
+    )
+    total_count = models.PositiveIntegerField(default=0)
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'employee_attendance_rollup'
+
+    def __str__(self):
+        return f"{self.employee_id} - {self.present_count}/{self.total_count} present"
@@ -0,0 +1,121 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, Cursor
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class HRMSCursorPagination(CursorPagination):
+    """
+    Keyset pagination over every ordering column.
+
+    DRF's CursorPagination only keys on ``ordering[0]`` and steps through
+    rows sharing that value with an OFFSET capped at ``offset_cutoff``, so
+    a long run of equal values (one busy day) can't be paged past. Here the
+    cursor holds the whole ordering tuple and the next page is one
+    ``WHERE (a, b, c) > (x, y, z)`` away. The last ordering column must be
+    unique.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        # A reverse cursor walks backwards from its position, then the page
+        # is flipped back into display order
+        ordering = [self._flip(field) for field in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            try:
+                queryset = queryset.filter(self._after(ordering, self.cursor.position))
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # One extra row tells whether another page follows
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > len(self.page)
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Walked backwards off the start; the first page comes next
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self._position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._position(self.page[0]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            reverse, position = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            if len(position) != len(self.ordering) or not all(isinstance(value, str) for value in position):
+                raise ValueError(position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=0, reverse=bool(reverse), position=position)
+
+    def encode_cursor(self, cursor):
+        encoded = urlsafe_b64encode(json.dumps([int(cursor.reverse), cursor.position]).encode('ascii'))
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def _position(self, row):
+        # Rows are .values() dicts on the list endpoints, model instances otherwise
+        fields = [field.lstrip('-') for field in self.ordering]
+        if isinstance(row, dict):
+            return [str(row[field]) for field in fields]
+        return [str(getattr(row, field)) for field in fields]
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    @staticmethod
+    def _after(ordering, position):
+        # (a, b, c) past (x, y, z): a past x, or a = x and (b past y, or ...)
+        condition = None
+        for field, value in reversed(list(zip(ordering, position))):
+            name = field.lstrip('-')
+            past = Q(**{f"{name}__{'lt' if field.startswith('-') else 'gt'}": value})
+            condition = past if condition is None else past | (Q(**{name: value}) & condition)
+        return condition
+
+
+class EmployeeCursorPagination(HRMSCursorPagination):
+    ordering = ('-created_at', 'employee_id')
+
+
+class AttendanceCursorPagination(HRMSCursorPagination):
+    # Newest day first, then by employee, as the list has always been shown
+    ordering = ('-date', 'employee_id', 'id')
@@ -0,0 +1,75 @@
+"""
+Counter maintenance for the attendance rollup tables.
+
+The dashboard and employee summary read precomputed counts from
+``attendance_daily_rollup`` and ``employee_attendance_rollup`` instead of
+aggregating the whole ``attendance`` table on every request.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import F
+
+from .models import AttendanceDailyRollup, EmployeeAttendanceRollup
+
+STATUS_COUNTERS = {
+    'Present': 'present_count',
+    'Absent': 'absent_count',
+}
+
+
+# Keeps IN (...) lists well under SQLite's bound-parameter limit
+BATCH_SIZE = 500
+
+
+def _apply_deltas(model, key_field, deltas_by_key):
+    """
+    Add per-row counter deltas with a handful of set-based statements.
+
+    Missing rows are seeded with zero counters in one INSERT (conflicts
+    ignored), then keys sharing the same deltas are updated together with
+    one ``UPDATE ... SET counter = counter + n WHERE key IN (...)``.
+    """
+    groups = defaultdict(list)
+    seed = []
+    for key, deltas in deltas_by_key.items():
+        deltas = tuple(sorted((name, delta) for name, delta in deltas.items() if delta))
+        if not deltas:
+            continue
+        groups[deltas].append(key)
+        # A key that only loses counts already has a row (or its employee
+        # is being deleted), so only seed keys that gain counts
+        if any(delta > 0 for _, delta in deltas):
+            seed.append(model(**{key_field: key}))
+
+    model.objects.bulk_create(seed, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    for deltas, keys in groups.items():
+        updates = {name: F(name) + delta for name, delta in deltas}
+        for start in range(0, len(keys), BATCH_SIZE):
+            model.objects.filter(**{f'{key_field}__in': keys[start:start + BATCH_SIZE]}).update(**updates)
+
+
+def apply_attendance_changes(changes):
+    """
+    Update the rollups for ``(old_key, new_key)`` pairs of attendance records.
+
+    Keys are ``(employee_id, date, status)`` tuples; ``old_key`` is None for
+    a new record and ``new_key`` is None for a deleted one. Deltas are summed
+    first, so the statement count doesn't grow with the size of the batch.
+    """
+    daily = defaultdict(Counter)
+    per_employee = defaultdict(Counter)
+    for old_key, new_key in changes:
+        if old_key == new_key:
+            continue
+        for key, delta in ((old_key, -1), (new_key, 1)):
+            if key is None:
+                continue
+            employee_id, day, status = key
+            counter = STATUS_COUNTERS[status]
+            daily[day][counter] += delta
+            per_employee[employee_id]['total_count'] += delta
+            per_employee[employee_id][counter] += delta
+
+    _apply_deltas(AttendanceDailyRollup, 'date', daily)
+    _apply_deltas(EmployeeAttendanceRollup, 'employee_id', per_employee)
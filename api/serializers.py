@@ -1,62 +1,279 @@
 from rest_framework import serializers
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from .dashboard import invalidate_dashboard_stats
 from .models import Employee, Attendance
+from .rollups import BATCH_SIZE, apply_attendance_changes
+from collections import defaultdict
 from datetime import date
 
 
+class EmployeeListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        # Raised from here (not validate()) so errors stay one entry per item
+        items = super().to_internal_value(data)
+        errors = self._unique_errors(items)
+        if errors:
+            raise serializers.ValidationError(errors, code='unique')
+        return items
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                employees = Employee.objects.bulk_create(
+                    [Employee(**item) for item in validated_data],
+                    batch_size=500
+                )
+        except IntegrityError:
+            # Lost a race with another writer since validation
+            errors = self._unique_errors(validated_data)
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors, code='unique')
+        # bulk_create skips the post_save signal
+        invalidate_dashboard_stats()
+        return employees
+
+    def _unique_errors(self, items):
+        # A query per BATCH_SIZE values of each column, plus duplicates
+        # inside the payload
+        taken_ids = self._taken('employee_id', [item['employee_id'] for item in items])
+        taken_emails = self._taken('email', [item['email'] for item in items])
+
+        messages = EmployeeSerializer.unique_messages
+        errors = []
+        for item in items:
+            item_errors = {}
+            if item['employee_id'] in taken_ids:
+                item_errors['employee_id'] = [messages['employee_id']]
+            if item['email'] in taken_emails:
+                item_errors['email'] = [messages['email']]
+            taken_ids.add(item['employee_id'])
+            taken_emails.add(item['email'])
+            errors.append(item_errors)
+        return errors if any(errors) else None
+
+    def _taken(self, field, values):
+        taken = set()
+        for start in range(0, len(values), BATCH_SIZE):
+            taken.update(Employee.objects.filter(
+                **{f'{field}__in': values[start:start + BATCH_SIZE]}
+            ).values_list(field, flat=True))
+        return taken
+
+
 class EmployeeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = ['employee_id', 'full_name', 'email', 'department', 'created_at']
         read_only_fields = ['created_at']
+        list_serializer_class = EmployeeListSerializer
+        # CharField already trims whitespace and rejects blank values, so no
+        # validate_<field> methods are needed; uniqueness is enforced by the
+        # INSERT itself, see _save_unique()
+        extra_kwargs = {
+            'employee_id': {'validators': [], 'error_messages': {'blank': "Employee ID cannot be empty"}},
+            'full_name': {'error_messages': {'blank': "Full name cannot be empty"}},
+            'email': {'validators': []},
+            'department': {'error_messages': {'blank': "Department cannot be empty"}},
+        }
+
+    unique_messages = {
+        'employee_id': "employee with this employee id already exists.",
+        'email': "employee with this email already exists.",
+    }
+
+    def create(self, validated_data):
+        return self._save_unique(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        employee_id = validated_data.get('employee_id', instance.employee_id)
+        # Saving under another existing primary key would overwrite that row
+        if employee_id != instance.employee_id and Employee.objects.filter(employee_id=employee_id).exists():
+            raise serializers.ValidationError({'employee_id': [self.unique_messages['employee_id']]}, code='unique')
+        return self._save_unique(super().update, instance, validated_data)
+
+    def _save_unique(self, save, *args):
+        validated_data = args[-1]
+        try:
+            with transaction.atomic():
+                return save(*args)
+        except IntegrityError:
+            # Only look up which value clashed once the write has failed
+            conflicts = Employee.objects.filter(
+                Q(employee_id=validated_data.get('employee_id')) | Q(email=validated_data.get('email'))
+            )
+            if self.instance is not None:
+                conflicts = conflicts.exclude(pk=self.instance.pk)
+            errors = {}
+            for employee_id, email in conflicts.values_list('employee_id', 'email'):
+                if employee_id == validated_data.get('employee_id'):
+                    errors['employee_id'] = [self.unique_messages['employee_id']]
+                if email == validated_data.get('email'):
+                    errors['email'] = [self.unique_messages['email']]
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors, code='unique')
+
+
+class EmployeeWithAttendanceSerializer(EmployeeSerializer):
+    """List rows: the employee plus counts from its attendance rollup."""
+    total_days = serializers.IntegerField(read_only=True)
+    present_days = serializers.IntegerField(read_only=True)
+    absent_days = serializers.IntegerField(read_only=True)
+
+    class Meta(EmployeeSerializer.Meta):
+        fields = EmployeeSerializer.Meta.fields + ['total_days', 'present_days', 'absent_days']
+
+
+class EmployeePageSerializer(serializers.Serializer):
+    next = serializers.URLField(allow_null=True)
+    previous = serializers.URLField(allow_null=True)
+    results = EmployeeWithAttendanceSerializer(many=True)
 
-    def validate_employee_id(self, value):
-        if not value or not value.strip():
-            raise serializers.ValidationError("Employee ID cannot be empty")
-        return value.strip()
 
-    def validate_full_name(self, value):
-        if not value or not value.strip():
-            raise serializers.ValidationError("Full name cannot be empty")
-        return value.strip()
+class EmployeeRelatedField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        # Trim like the CharField this replaced did
+        if isinstance(data, str):
+            data = data.strip()
+        # Use the batch fetched by AttendanceListSerializer when present
+        employees = self.context.get('employees')
+        if employees is None:
+            return super().to_internal_value(data)
+        employee = employees.get(str(data))
+        if employee is None:
+            self.fail('does_not_exist', pk_value=data)
+        return employee
 
-    def validate_department(self, value):
-        if not value or not value.strip():
-            raise serializers.ValidationError("Department cannot be empty")
-        return value.strip()
+
+class AttendanceListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            employee_ids = {
+                str(item['employee_id']).strip() for item in data
+                if isinstance(item, dict) and item.get('employee_id') is not None
+            }
+            self.context['employees'] = Employee.objects.in_bulk(employee_ids)
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        # Last entry wins when the same employee/date is sent twice
+        marks = {(item['employee'].pk, item['date']): item for item in validated_data}
+        if not marks:
+            return []
+
+        with transaction.atomic():
+            # Row locks on attendance can't cover records that don't exist
+            # yet, so two writers could both see "no previous row" and count
+            # the same new record twice. Lock the employees instead: other
+            # bulk marks queue here, and any attendance INSERT for them waits
+            # too, as its foreign key check takes a share lock on the employee
+            self._lock_employees(marks)
+            # Locked so a concurrent single-record mark can't change a status
+            # between this read and the upsert
+            previous = {
+                (employee_id, day): status
+                for queryset in self._marked_querysets(marks)
+                for employee_id, day, status in
+                queryset.select_for_update().values_list('employee_id', 'date', 'status')
+            }
+            Attendance.objects.bulk_create(
+                [Attendance(employee=item['employee'], date=item['date'], status=item['status'])
+                 for item in marks.values()],
+                update_conflicts=True,
+                unique_fields=['employee', 'date'],
+                update_fields=['status']
+            )
+            # bulk_create skips signals, so keep the rollups in step here
+            apply_attendance_changes([
+                ((employee_id, day, previous[(employee_id, day)]) if (employee_id, day) in previous else None,
+                 (employee_id, day, item['status']))
+                for (employee_id, day), item in marks.items()
+            ])
+            invalidate_dashboard_stats()
+            records = [
+                record
+                for queryset in self._marked_querysets(marks)
+                for record in queryset.with_employee_details()
+            ]
+        records.sort(key=lambda record: record.employee_id)
+        records.sort(key=lambda record: record.date, reverse=True)
+        return records
+
+    def _lock_employees(self, marks):
+        # Sorted so concurrent batches take the locks in the same order
+        employee_ids = sorted({employee_id for employee_id, _ in marks})
+        for start in range(0, len(employee_ids), BATCH_SIZE):
+            list(
+                Employee.objects.select_for_update()
+                .filter(pk__in=employee_ids[start:start + BATCH_SIZE])
+                .order_by('pk').values_list('pk', flat=True)
+            )
+
+    def _marked_querysets(self, marks):
+        # One date with an IN list per chunk; OR-ing a Q per pair overflows
+        # SQLite's expression depth at about a thousand rows
+        employees_by_date = defaultdict(list)
+        for employee_id, day in marks:
+            employees_by_date[day].append(employee_id)
+        for day, employee_ids in employees_by_date.items():
+            for start in range(0, len(employee_ids), BATCH_SIZE):
+                yield Attendance.objects.filter(
+                    date=day, employee_id__in=employee_ids[start:start + BATCH_SIZE]
+                )
 
 
 class AttendanceSerializer(serializers.ModelSerializer):
-    employee_id = serializers.CharField()
-    employee_name = serializers.CharField(source='employee.full_name', read_only=True)
-    employee_department = serializers.CharField(source='employee.department', read_only=True)
+    employee_id = EmployeeRelatedField(
+        queryset=Employee.objects.all(),
+        source='employee',
+        error_messages={'does_not_exist': "Employee with ID '{pk_value}' not found"}
+    )
+    # Filled by AttendanceQuerySet.with_employee_details()
+    employee_name = serializers.CharField(read_only=True)
+    employee_department = serializers.CharField(read_only=True)
 
     class Meta:
         model = Attendance
         fields = ['id', 'employee_id', 'date', 'status', 'created_at', 'employee_name', 'employee_department']
         read_only_fields = ['id', 'created_at', 'employee_name', 'employee_department']
+        list_serializer_class = AttendanceListSerializer
+        # Marking the same employee/date again updates the existing record
+        validators = []
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
 
     def validate_date(self, value):
         if value > date.today():
             raise serializers.ValidationError("Cannot mark attendance for future dates")
         return value
 
-    def validate_employee_id(self, value):
-        try:
-            Employee.objects.get(employee_id=value)
-        except Employee.DoesNotExist:
-            raise serializers.ValidationError(f"Employee with ID '{value}' not found")
-        return value
-
     def create(self, validated_data):
-        employee_id = validated_data.pop('employee_id')
-        employee = Employee.objects.get(employee_id=employee_id)
-        
         # Update or create attendance record
         attendance, created = Attendance.objects.update_or_create(
-            employee=employee,
+            employee=validated_data['employee'],
             date=validated_data['date'],
             defaults={'status': validated_data['status']}
         )
+        return self._add_employee_details(attendance)
+
+    def update(self, instance, validated_data):
+        attendance = super().update(instance, validated_data)
+        if 'employee' in validated_data:
+            self._add_employee_details(attendance)
+        return attendance
+
+    def _add_employee_details(self, attendance):
+        # Same attributes with_employee_details() annotates, taken from the
+        # employee validation already loaded
+        attendance.employee_name = attendance.employee.full_name
+        attendance.employee_department = attendance.employee.department
         return attendance
 
 
@@ -65,3 +282,19 @@ class DashboardStatsSerializer(serializers.Serializer):
     total_attendance_records = serializers.IntegerField()
     present_today = serializers.IntegerField()
     absent_today = serializers.IntegerField()
+
+
+class DailyAttendanceQuerySerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs['start'] > attrs['end']:
+            raise serializers.ValidationError("start must be on or before end")
+        return attrs
+
+
+class DailyAttendanceSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    present_count = serializers.IntegerField()
+    absent_count = serializers.IntegerField()
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .dashboard import invalidate_dashboard_stats
+from .models import Employee, Attendance
+from .rollups import apply_attendance_changes
+
+
+def _locked_rollup_key(pk):
+    # What the rollups currently count for this row, read under a row lock
+    return (
+        Attendance.objects.select_for_update().filter(pk=pk)
+        .values_list('employee_id', 'date', 'status')
+        .first()
+    )
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_previous_attendance(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._rollup_key = None if instance.pk is None else _locked_rollup_key(instance.pk)
+
+
+@receiver(post_save, sender=Attendance)
+def update_rollups_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_key = None if created else instance._rollup_key
+    apply_attendance_changes([(old_key, instance.rollup_key())])
+    invalidate_dashboard_stats()
+
+
+def _deleted_with_employee(origin):
+    # origin is the instance or queryset delete() was called on
+    return isinstance(origin, Employee) or (isinstance(origin, QuerySet) and origin.model is Employee)
+
+
+@receiver(pre_delete, sender=Attendance)
+def remember_deleted_attendance(sender, instance, origin=None, **kwargs):
+    # Rows cascaded from an employee are counted out in one batch instead
+    if _deleted_with_employee(origin):
+        return
+    # Runs inside the deletion's transaction
+    instance._rollup_key = _locked_rollup_key(instance.pk)
+
+
+@receiver(post_delete, sender=Attendance)
+def update_rollups_on_delete(sender, instance, origin=None, **kwargs):
+    if _deleted_with_employee(origin):
+        return
+    # None when another request already deleted the row
+    if instance._rollup_key is not None:
+        apply_attendance_changes([(instance._rollup_key, None)])
+    invalidate_dashboard_stats()
+
+
+@receiver(pre_delete, sender=Employee)
+def remove_employee_attendance_from_rollups(sender, instance, **kwargs):
+    # One locked read of the employee's records before the cascade removes them
+    records = (
+        Attendance.objects.select_for_update().filter(employee_id=instance.pk)
+        .values_list('employee_id', 'date', 'status')
+    )
+    apply_attendance_changes([(key, None) for key in records])
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_dashboard_on_employee_change(sender, **kwargs):
+    invalidate_dashboard_stats()
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
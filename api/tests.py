@@ -0,0 +1,511 @@
+import json
+from datetime import date, timedelta
+from unittest import mock
+
+from django.db import DatabaseError
+from django.db.models import Count, Q
+from rest_framework.test import APITestCase
+
+from .models import Employee, Attendance, AttendanceDailyRollup, EmployeeAttendanceRollup
+
+
+class HRMSTestCase(APITestCase):
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+
+    def setUp(self):
+        self.ann = Employee.objects.create(
+            employee_id='E1', full_name='Ann', email='ann@example.com', department='HR'
+        )
+        self.bob = Employee.objects.create(
+            employee_id='E2', full_name='Bob', email='bob@example.com', department='IT'
+        )
+
+    def mark(self, employee_id, day, status):
+        response = self.client.post('/api/attendance/', {
+            'employee_id': employee_id, 'date': day.isoformat(), 'status': status
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def daily_counts(self):
+        return {
+            row.date: (row.present_count, row.absent_count)
+            for row in AttendanceDailyRollup.objects.all()
+            if row.present_count or row.absent_count
+        }
+
+    def employee_counts(self):
+        return {
+            row.employee_id: (row.total_count, row.present_count, row.absent_count)
+            for row in EmployeeAttendanceRollup.objects.all()
+            if row.total_count
+        }
+
+    def assertRollupsMatchAttendance(self):
+        present = Count('id', filter=Q(status='Present'))
+        absent = Count('id', filter=Q(status='Absent'))
+        expected_daily = {
+            row['date']: (row['present'], row['absent'])
+            for row in Attendance.objects.values('date').annotate(present=present, absent=absent)
+        }
+        expected_employee = {
+            row['employee_id']: (row['total'], row['present'], row['absent'])
+            for row in Attendance.objects.values('employee_id').annotate(
+                total=Count('id'), present=present, absent=absent
+            )
+        }
+        self.assertEqual(self.daily_counts(), expected_daily)
+        self.assertEqual(self.employee_counts(), expected_employee)
+
+
+class AttendanceRollupTests(HRMSTestCase):
+    def test_create_counts_record(self):
+        self.mark('E1', self.today, 'Present')
+        self.mark('E2', self.today, 'Absent')
+
+        self.assertEqual(self.daily_counts(), {self.today: (1, 1)})
+        self.assertEqual(self.employee_counts(), {'E1': (1, 1, 0), 'E2': (1, 0, 1)})
+        self.assertRollupsMatchAttendance()
+
+    def test_employee_id_is_trimmed(self):
+        record = self.mark(' E1 ', self.today, 'Present')
+
+        self.assertEqual(record['employee_id'], 'E1')
+
+    def test_marking_same_day_again_moves_counter(self):
+        self.mark('E1', self.today, 'Present')
+        self.mark('E1', self.today, 'Absent')
+
+        self.assertEqual(self.daily_counts(), {self.today: (0, 1)})
+        self.assertEqual(self.employee_counts(), {'E1': (1, 0, 1)})
+
+    def test_update_status(self):
+        record = self.mark('E1', self.today, 'Present')
+
+        response = self.client.patch(f"/api/attendance/{record['id']}/", {'status': 'Absent'}, format='json')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.daily_counts(), {self.today: (0, 1)})
+        self.assertEqual(self.employee_counts(), {'E1': (1, 0, 1)})
+
+    def test_update_employee_and_date(self):
+        record = self.mark('E1', self.today, 'Present')
+
+        response = self.client.put(f"/api/attendance/{record['id']}/", {
+            'employee_id': 'E2', 'date': self.yesterday.isoformat(), 'status': 'Present'
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['employee_name'], 'Bob')
+        self.assertEqual(self.daily_counts(), {self.yesterday: (1, 0)})
+        self.assertEqual(self.employee_counts(), {'E2': (1, 1, 0)})
+
+    def test_saving_stale_copy_does_not_count_twice(self):
+        record = self.mark('E1', self.today, 'Present')
+        stale = Attendance.objects.get(pk=record['id'])
+
+        self.client.patch(f"/api/attendance/{record['id']}/", {'status': 'Absent'}, format='json')
+        stale.status = 'Absent'
+        stale.save()
+
+        self.assertEqual(self.daily_counts(), {self.today: (0, 1)})
+        self.assertEqual(self.employee_counts(), {'E1': (1, 0, 1)})
+
+    def test_delete(self):
+        record = self.mark('E1', self.today, 'Present')
+        self.mark('E2', self.today, 'Present')
+
+        response = self.client.delete(f"/api/attendance/{record['id']}/")
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.daily_counts(), {self.today: (1, 0)})
+        self.assertEqual(self.employee_counts(), {'E2': (1, 1, 0)})
+
+    def test_employee_delete_cascades(self):
+        self.mark('E1', self.today, 'Present')
+        self.mark('E1', self.yesterday, 'Absent')
+        self.mark('E2', self.today, 'Absent')
+
+        with self.assertNumQueries(self.EMPLOYEE_DELETE_QUERIES):
+            response = self.client.delete('/api/employees/E1/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.daily_counts(), {self.today: (0, 1)})
+        self.assertEqual(self.employee_counts(), {'E2': (1, 0, 1)})
+        self.assertFalse(EmployeeAttendanceRollup.objects.filter(employee_id='E1').exists())
+
+    # employee lookup, collecting the cascade, locked read of its records,
+    # 2+1 rollup statements, and one DELETE per table
+    EMPLOYEE_DELETE_QUERIES = 9
+
+    def test_employee_delete_cost_does_not_grow_with_records(self):
+        # 100 rows: Django itself DELETEs collected rows 100 ids at a time
+        days = [self.today - timedelta(days=n) for n in range(100)]
+        self.client.post('/api/attendance/bulk/', [
+            {'employee_id': 'E1', 'date': day.isoformat(), 'status': ('Present', 'Absent')[n % 2]}
+            for n, day in enumerate(days)
+        ], format='json')
+
+        with self.assertNumQueries(self.EMPLOYEE_DELETE_QUERIES):
+            response = self.client.delete('/api/employees/E1/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.daily_counts(), {})
+        self.assertRollupsMatchAttendance()
+
+
+class BulkAttendanceRollupTests(HRMSTestCase):
+    def bulk_mark(self, records):
+        response = self.client.post('/api/attendance/bulk/', [
+            {'employee_id': employee_id, 'date': day.isoformat(), 'status': status}
+            for employee_id, day, status in records
+        ], format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def test_bulk_mark_counts_new_and_changed_records(self):
+        self.mark('E1', self.today, 'Present')
+
+        data = self.bulk_mark([
+            ('E1', self.today, 'Absent'),
+            ('E2', self.today, 'Present'),
+            ('E2', self.today, 'Absent'),
+            ('E1', self.yesterday, 'Present'),
+        ])
+
+        self.assertEqual(
+            [(row['employee_id'], row['date'], row['status']) for row in data],
+            [('E1', self.today.isoformat(), 'Absent'),
+             ('E2', self.today.isoformat(), 'Absent'),
+             ('E1', self.yesterday.isoformat(), 'Present')]
+        )
+        self.assertEqual(self.daily_counts(), {self.today: (0, 2), self.yesterday: (1, 0)})
+        self.assertEqual(self.employee_counts(), {'E1': (2, 1, 1), 'E2': (1, 0, 1)})
+        self.assertRollupsMatchAttendance()
+
+    def test_bulk_mark_trims_employee_ids(self):
+        data = self.bulk_mark([(' E1 ', self.today, 'Present')])
+
+        self.assertEqual(data[0]['employee_id'], 'E1')
+
+    def test_bulk_mark_whole_company(self):
+        Employee.objects.bulk_create([
+            Employee(employee_id=f'B{n}', full_name=f'Staff {n}', email=f'b{n}@example.com', department='Ops')
+            for n in range(1500)
+        ])
+        everyone = [f'B{n}' for n in range(1500)]
+
+        self.bulk_mark([(employee_id, self.today, 'Present') for employee_id in everyone])
+        self.bulk_mark([(employee_id, self.today, 'Absent') for employee_id in everyone[:700]])
+
+        self.assertEqual(self.daily_counts(), {self.today: (800, 700)})
+        self.assertRollupsMatchAttendance()
+
+    def test_bulk_mark_statement_count_does_not_grow_with_batch(self):
+        Employee.objects.bulk_create([
+            Employee(employee_id=f'B{n}', full_name=f'Staff {n}', email=f'b{n}@example.com', department='Ops')
+            for n in range(100)
+        ])
+        records = [(f'B{n}', self.today, 'Present') for n in range(100)]
+
+        # validation, employee lock, locked read, upsert, 2x2 rollup
+        # statements, re-read, plus the savepoint around the batch
+        with self.assertNumQueries(11):
+            self.bulk_mark(records)
+        with self.assertNumQueries(11):
+            self.bulk_mark([(employee_id, day, 'Absent') for employee_id, day, _ in records])
+        self.assertRollupsMatchAttendance()
+
+
+class DashboardStatsTests(HRMSTestCase):
+    def stats(self):
+        response = self.client.get('/api/dashboard/stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_stats_are_cached_until_a_write(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mark('E1', self.today, 'Present')
+        self.assertEqual(self.stats(), {
+            'total_employees': 2, 'total_attendance_records': 1, 'present_today': 1, 'absent_today': 0
+        })
+
+        # Served from the shared cache
+        with self.assertNumQueries(1):
+            self.stats()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mark('E2', self.today, 'Absent')
+        self.assertEqual(self.stats()['absent_today'], 1)
+
+    def test_cache_failure_does_not_fail_committed_write(self):
+        with mock.patch('api.dashboard.cache.delete', side_effect=DatabaseError('no such table')), \
+                self.assertLogs('api.dashboard', 'ERROR'), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/employees/', {
+                'employee_id': 'E3', 'full_name': 'Cy', 'email': 'cy@example.com', 'department': 'Ops'
+            }, format='json')
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertTrue(Employee.objects.filter(pk='E3').exists())
+
+
+class AttendanceListTests(HRMSTestCase):
+    def test_list_orders_by_day_then_employee(self):
+        self.mark('E2', self.today, 'Present')
+        self.mark('E1', self.yesterday, 'Present')
+        self.mark('E1', self.today, 'Absent')
+
+        # One row per page, so today's two records sit on either side of a boundary
+        rows, url = [], '/api/attendance/?page_size=1'
+        while url:
+            data = self.client.get(url).json()
+            rows.extend((row['date'], row['employee_id']) for row in data['results'])
+            url = data['next']
+
+        self.assertEqual(
+            rows,
+            [(self.today.isoformat(), 'E1'), (self.today.isoformat(), 'E2'), (self.yesterday.isoformat(), 'E1')]
+        )
+
+    def test_empty_fields_returns_every_field(self):
+        self.mark('E1', self.today, 'Present')
+
+        response = self.client.get('/api/attendance/?fields=,')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['employee_name'], 'Ann')
+
+    def test_unknown_fields_are_rejected(self):
+        record = self.mark('E1', self.today, 'Present')
+
+        for url in ('/api/attendance/', f"/api/attendance/{record['id']}/"):
+            response = self.client.get(url, {'fields': 'id,bogus'})
+
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data, {'fields': ["Unknown field 'bogus'"]})
+
+    def test_pages_walk_through_a_single_day(self):
+        # More rows in one day than DRF's offset_cutoff used to reach
+        Employee.objects.bulk_create([
+            Employee(employee_id=f'B{n:04}', full_name=f'Staff {n}', email=f'b{n}@example.com', department='Ops')
+            for n in range(1200)
+        ])
+        Attendance.objects.bulk_create([
+            Attendance(employee_id=f'B{n:04}', date=self.today, status='Present') for n in range(1200)
+        ])
+
+        pages, url = [], '/api/attendance/?page_size=500'
+        while url:
+            data = self.client.get(url).json()
+            pages.append([row['employee_id'] for row in data['results']])
+            url = data['next']
+
+        self.assertEqual([len(page) for page in pages], [500, 500, 200])
+        self.assertEqual(sum(pages, []), [f'B{n:04}' for n in range(1200)])
+
+        # and back again from the last page
+        backwards, url = [], data['previous']
+        while url:
+            data = self.client.get(url).json()
+            backwards.insert(0, [row['employee_id'] for row in data['results']])
+            url = data['previous']
+        self.assertEqual(backwards, pages[:-1])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get('/api/attendance/?cursor=bogus')
+
+        self.assertEqual(response.status_code, 404)
+
+
+class EmployeeSummaryTests(HRMSTestCase):
+    def summary(self, employee_id):
+        return self.client.get(f'/api/attendance/employee/{employee_id}/summary/')
+
+    def test_employee_without_attendance_gets_zeros(self):
+        response = self.summary('E2')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'employee_id': 'E2', 'employee_name': 'Bob', 'total_days': 0, 'present_days': 0, 'absent_days': 0
+        })
+
+    def test_counts_marked_days(self):
+        self.mark('E1', self.today, 'Present')
+        self.mark('E1', self.yesterday, 'Absent')
+        self.mark('E2', self.today, 'Present')
+
+        response = self.summary('E1')
+
+        self.assertEqual(response.data, {
+            'employee_id': 'E1', 'employee_name': 'Ann', 'total_days': 2, 'present_days': 1, 'absent_days': 1
+        })
+
+    def test_unknown_employee(self):
+        response = self.summary('E9')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data, {'detail': "Employee with ID 'E9' not found"})
+
+
+class DailyAttendanceTests(HRMSTestCase):
+    def daily(self, **params):
+        return self.client.get('/api/attendance/daily/', params)
+
+    def test_counts_days_in_range(self):
+        earlier = self.today - timedelta(days=5)
+        self.mark('E1', self.today, 'Present')
+        self.mark('E2', self.today, 'Absent')
+        self.mark('E1', self.yesterday, 'Absent')
+        self.mark('E1', earlier, 'Present')
+
+        response = self.daily(start=self.yesterday.isoformat(), end=self.today.isoformat())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [
+            {'date': self.yesterday.isoformat(), 'present_count': 0, 'absent_count': 1},
+            {'date': self.today.isoformat(), 'present_count': 1, 'absent_count': 1},
+        ])
+
+    def test_skips_days_left_at_zero(self):
+        record = self.mark('E1', self.yesterday, 'Present')
+        self.mark('E1', self.today, 'Present')
+        self.client.delete(f"/api/attendance/{record['id']}/")
+
+        response = self.daily(start=self.yesterday.isoformat(), end=self.today.isoformat())
+
+        self.assertEqual([row['date'] for row in response.json()], [self.today.isoformat()])
+
+    def test_requires_start_and_end(self):
+        response = self.daily(start=self.today.isoformat())
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('end', response.data)
+
+    def test_start_after_end(self):
+        response = self.daily(start=self.today.isoformat(), end=self.yesterday.isoformat())
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'non_field_errors': ['start must be on or before end']})
+
+
+class AttendanceExportTests(HRMSTestCase):
+    def test_export_matches_list_output(self):
+        self.mark('E1', self.today, 'Present')
+        self.mark('E2', self.yesterday, 'Absent')
+
+        listed = self.client.get('/api/attendance/').json()['results']
+        response = self.client.get('/api/attendance/export/')
+        exported = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(exported, listed)
+
+
+class EmployeeListTests(HRMSTestCase):
+    def test_list_includes_attendance_counts(self):
+        self.mark('E1', self.today, 'Present')
+        self.mark('E1', self.yesterday, 'Absent')
+
+        response = self.client.get('/api/employees/')
+
+        counts = {
+            row['employee_id']: (row['total_days'], row['present_days'], row['absent_days'])
+            for row in response.data['results']
+        }
+        self.assertEqual(counts, {'E1': (2, 1, 1), 'E2': (0, 0, 0)})
+
+    def test_pages_walk_every_employee(self):
+        seen, url = [], '/api/employees/?page_size=1'
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(row['employee_id'] for row in data['results'])
+            url = data['next']
+
+        self.assertEqual(seen, ['E2', 'E1'])
+
+
+class EmployeeUniquenessTests(HRMSTestCase):
+    def assertUniqueError(self, response, field):
+        self.assertEqual(response.status_code, 400, response.data)
+        self.assertEqual([error.code for error in response.data[field]], ['unique'])
+
+    def test_create_with_taken_values(self):
+        response = self.client.post('/api/employees/', {
+            'employee_id': 'E1', 'full_name': 'Cy', 'email': 'bob@example.com', 'department': 'HR'
+        }, format='json')
+
+        self.assertUniqueError(response, 'employee_id')
+        self.assertUniqueError(response, 'email')
+        self.assertEqual(Employee.objects.count(), 2)
+
+    def test_update_with_taken_email(self):
+        response = self.client.patch('/api/employees/E1/', {'email': 'bob@example.com'}, format='json')
+
+        self.assertUniqueError(response, 'email')
+        self.assertEqual(Employee.objects.get(pk='E1').email, 'ann@example.com')
+
+    def test_update_keeping_own_values(self):
+        response = self.client.put('/api/employees/E1/', {
+            'employee_id': 'E1', 'full_name': 'Ann B', 'email': 'ann@example.com', 'department': 'HR'
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def test_update_onto_existing_employee_id(self):
+        response = self.client.patch('/api/employees/E1/', {'employee_id': 'E2'}, format='json')
+
+        self.assertUniqueError(response, 'employee_id')
+        self.assertEqual(Employee.objects.get(pk='E2').full_name, 'Bob')
+
+
+class EmployeeBulkCreateTests(HRMSTestCase):
+    def employee(self, employee_id, email):
+        return {'employee_id': employee_id, 'full_name': 'Staff', 'email': email, 'department': 'Ops'}
+
+    def test_creates_every_employee(self):
+        response = self.client.post('/api/employees/bulk/', [
+            self.employee('E3', 'e3@example.com'), self.employee('E4', 'e4@example.com')
+        ], format='json')
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual([row['employee_id'] for row in response.data], ['E3', 'E4'])
+        self.assertEqual(Employee.objects.count(), 4)
+
+    def test_duplicates_within_payload(self):
+        response = self.client.post('/api/employees/bulk/', [
+            self.employee('E3', 'e3@example.com'),
+            self.employee('E3', 'other@example.com'),
+            self.employee('E4', 'e3@example.com'),
+        ], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertEqual(list(response.data[1]), ['employee_id'])
+        self.assertEqual(list(response.data[2]), ['email'])
+        self.assertEqual(Employee.objects.count(), 2)
+
+    def test_clashes_with_existing_rows(self):
+        response = self.client.post('/api/employees/bulk/', [
+            self.employee('E3', 'e3@example.com'),
+            self.employee('E1', 'bob@example.com'),
+        ], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, [{}, {
+            'employee_id': ['employee with this employee id already exists.'],
+            'email': ['employee with this email already exists.'],
+        }])
+        self.assertEqual(response.data[1]['employee_id'][0].code, 'unique')
+        self.assertFalse(Employee.objects.filter(pk='E3').exists())
+
+    def test_clashes_found_across_batches(self):
+        with mock.patch('api.serializers.BATCH_SIZE', 2):
+            response = self.client.post('/api/employees/bulk/', [
+                self.employee(f'E{n}', f'e{n}@example.com') for n in range(3, 8)
+            ] + [self.employee('E9', 'ann@example.com')], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[:5], [{}] * 5)
+        self.assertEqual(list(response.data[5]), ['email'])
@@ -1,12 +1,23 @@
+import json
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
-from django.db.models import Count, Q
-from datetime import date
-from .models import Employee, Attendance
+from rest_framework.utils.encoders import JSONEncoder
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.db.models.functions import Coalesce
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from .dashboard import get_dashboard_stats
+from .models import Employee, Attendance, AttendanceDailyRollup
+from .pagination import EmployeeCursorPagination, AttendanceCursorPagination
 from .serializers import (
     EmployeeSerializer,
+    EmployeePageSerializer,
     AttendanceSerializer,
+    DailyAttendanceQuerySerializer,
+    DailyAttendanceSerializer,
     DashboardStatsSerializer
 )
 
@@ -14,20 +25,91 @@ from .serializers import (
 class EmployeeViewSet(viewsets.ModelViewSet):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
+    pagination_class = EmployeeCursorPagination
     lookup_field = 'employee_id'
 
+    # list() returns dicts directly; the serializer only documents the page shape
+    @swagger_auto_schema(responses={200: EmployeePageSerializer})
+    def list(self, request, *args, **kwargs):
+        # Read-only listing: plain dicts skip model instances and serializer fields.
+        # Attendance counts come from a LEFT JOIN on the per-employee rollup;
+        # prefetch_related('attendance_records') would load every attendance
+        # row into Python just to count them.
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            'employee_id', 'full_name', 'email', 'department', 'created_at',
+            total_days=Coalesce('attendance_rollup__total_count', 0),
+            present_days=Coalesce('attendance_rollup__present_count', 0),
+            absent_days=Coalesce('attendance_rollup__absent_count', 0)
+        )
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(list(page))
+
+    @swagger_auto_schema(
+        request_body=EmployeeSerializer(many=True),
+        responses={201: EmployeeSerializer(many=True)}
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def destroy(self, request, *args, **kwargs):
+        # Delete by key directly instead of loading the employee first
+        deleted, _ = Employee.objects.filter(employee_id=kwargs[self.lookup_field]).delete()
+        if not deleted:
+            raise NotFound()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 class AttendanceViewSet(viewsets.ModelViewSet):
-    queryset = Attendance.objects.select_related('employee').all()
+    queryset = Attendance.objects.all()
     serializer_class = AttendanceSerializer
+    pagination_class = AttendanceCursorPagination
+    employee_fields = {'employee_name', 'employee_department'}
+
+    def get_requested_fields(self):
+        # Optional ?fields=id,date,status to trim read responses
+        fields = self.request.query_params.get('fields')
+        if not fields or self.action not in ('list', 'retrieve'):
+            return None
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in AttendanceSerializer.Meta.fields]
+        if unknown:
+            raise ValidationError({'fields': [f"Unknown field '{field}'" for field in unknown]})
+        # ?fields=, names nothing; treat it as no filter everywhere
+        return fields or None
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        # Rows come back as dicts with the employee columns joined in SQL, so
+        # no model or serializer instances are built per record
+        fields = self.get_requested_fields() or AttendanceSerializer.Meta.fields
+        fields = [field for field in AttendanceSerializer.Meta.fields if field in fields]
+        # The cursor is computed from the ordering columns, so always select them
+        cursor_fields = [field.lstrip('-') for field in AttendanceCursorPagination.ordering]
+        queryset = self.filter_queryset(self.get_queryset()).values(*fields, *cursor_fields)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response([{field: row[field] for field in fields} for row in page])
 
     def get_queryset(self):
         queryset = super().get_queryset()
         
-        # Filter by employee_id
+        # Only join employees when the response includes employee details
+        fields = self.get_requested_fields()
+        if fields is None or self.employee_fields.intersection(fields):
+            queryset = queryset.with_employee_details()
+        
+        # Filter by employee_id (the FK column itself, no join needed)
         employee_id = self.request.query_params.get('employee_id')
         if employee_id:
-            queryset = queryset.filter(employee__employee_id=employee_id)
+            queryset = queryset.filter(employee_id=employee_id)
         
         # Filter by specific date (accept both 'date' and 'on_date' params)
         specific_date = self.request.query_params.get('on_date') or self.request.query_params.get('date')
@@ -43,49 +125,79 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         if end_date:
             queryset = queryset.filter(date__lte=end_date)
         
-        return queryset
+        return queryset.order_by(*AttendanceCursorPagination.ordering)
+
+    @swagger_auto_schema(
+        request_body=AttendanceSerializer(many=True),
+        responses={201: AttendanceSerializer(many=True)}
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_mark(self, request):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        records = serializer.save()
+        return Response(
+            self.get_serializer(records, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @swagger_auto_schema(
+        responses={200: openapi.Response(
+            "application/x-ndjson stream, one attendance record per line", AttendanceSerializer
+        )}
+    )
+    # Streams every matching record; no paginator, so no page parameters
+    @action(detail=False, methods=['get'], url_path='export', pagination_class=None)
+    def export(self, request):
+        # Stream NDJSON straight from a DB cursor; rows never become models
+        rows = self.filter_queryset(self.get_queryset()).values(
+            'id', 'employee_id', 'date', 'status', 'created_at', 'employee_name', 'employee_department'
+        ).iterator(chunk_size=2000)
+        lines = (json.dumps(row, cls=JSONEncoder) + '\n' for row in rows)
+        response = StreamingHttpResponse(lines, content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="attendance.ndjson"'
+        return response
+
+    @swagger_auto_schema(
+        query_serializer=DailyAttendanceQuerySerializer,
+        responses={200: DailyAttendanceSerializer(many=True)}
+    )
+    # Returns the whole range at once; no paginator, so no page parameters
+    @action(detail=False, methods=['get'], url_path='daily', pagination_class=None)
+    def daily(self, request):
+        query = DailyAttendanceQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        # One rollup row per day, so the cost follows the length of the range
+        rows = AttendanceDailyRollup.objects.filter(
+            date__range=(query.validated_data['start'], query.validated_data['end'])
+        ).exclude(present_count=0, absent_count=0).order_by('date').values(
+            'date', 'present_count', 'absent_count'
+        )
+        return Response(list(rows))
 
     @action(detail=False, methods=['get'], url_path='employee/(?P<employee_id>[^/.]+)/summary')
     def employee_summary(self, request, employee_id=None):
-        try:
-            employee = Employee.objects.get(employee_id=employee_id)
-        except Employee.DoesNotExist:
+        # One LEFT JOIN against the rollup row; employees with no attendance get zeros
+        summary = Employee.objects.filter(employee_id=employee_id).values(
+            'employee_id',
+            employee_name=F('full_name'),
+            total_days=Coalesce('attendance_rollup__total_count', 0),
+            present_days=Coalesce('attendance_rollup__present_count', 0),
+            absent_days=Coalesce('attendance_rollup__absent_count', 0)
+        ).first()
+        if summary is None:
             return Response(
                 {"detail": f"Employee with ID '{employee_id}' not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        attendance_summary = Attendance.objects.filter(employee=employee).aggregate(
-            total_days=Count('id'),
-            present_days=Count('id', filter=Q(status='Present')),
-            absent_days=Count('id', filter=Q(status='Absent'))
-        )
-        
-        return Response({
-            'employee_id': employee.employee_id,
-            'employee_name': employee.full_name,
-            'total_days': attendance_summary['total_days'] or 0,
-            'present_days': attendance_summary['present_days'] or 0,
-            'absent_days': attendance_summary['absent_days'] or 0,
-        })
+        return Response(summary)
 
 
 class DashboardViewSet(viewsets.ViewSet):
+    # The cached stats are already plain ints, so they are returned as-is;
+    # the serializer only documents the response shape.
+    @swagger_auto_schema(responses={200: DashboardStatsSerializer})
     @action(detail=False, methods=['get'], url_path='stats')
     def stats(self, request):
-        total_employees = Employee.objects.count()
-        total_attendance_records = Attendance.objects.count()
-        
-        today = date.today()
-        present_today = Attendance.objects.filter(date=today, status='Present').count()
-        absent_today = Attendance.objects.filter(date=today, status='Absent').count()
-        
-        data = {
-            'total_employees': total_employees,
-            'total_attendance_records': total_attendance_records,
-            'present_today': present_today,
-            'absent_today': absent_today,
-        }
-        
-        serializer = DashboardStatsSerializer(data)
-        return Response(serializer.data)
+        return Response(get_dashboard_stats())
@@ -63,20 +63,45 @@ WSGI_APPLICATION = 'hrms.wsgi.application'
 
 # Database
 # Use PostgreSQL in production if DATABASE_URL is set, else fallback to SQLite
+# Connections are kept open between requests; SQLite pragmas are applied once
+# per connection in api.signals.
 import dj_database_url
 DATABASE_URL = os.environ.get('DATABASE_URL')
 if DATABASE_URL:
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL, conn_max_age=600, ssl_require=True)
+        'default': dj_database_url.parse(
+            DATABASE_URL, conn_max_age=600, conn_health_checks=True, ssl_require=True
+        )
     }
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'hrms.db',
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
         }
     }
 
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'mmap_size': 268435456,
+    'cache_size': -20000,
+}
+
+# Cache
+# Shared by all gunicorn workers so invalidating the dashboard stats in one
+# worker is seen by the others; the table is created by migration
+# api.0005_create_cache_table
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'hrms_cache',
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {